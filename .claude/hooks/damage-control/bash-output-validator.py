@@ -18,154 +18,215 @@ import json
 import sys
 import re
 
+# orjson parses the hook payload in C when installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
-# Secret detection patterns with provider info
+
+# Secret detection patterns with provider info. Token formats with a fixed
+# case are matched case-sensitively; IGNORECASE makes sre case-fold every
+# position, so it's kept only where the text really varies in case.
 SECRET_PATTERNS = [
     {
-        "pattern": r"sk-ant-[A-Za-z0-9\-_]{20,}",
+        "re": re.compile(r"sk-ant-[A-Za-z0-9\-_]{20,}"),
         "name": "Anthropic API Key",
         "rotate_url": "console.anthropic.com/settings/keys"
     },
     {
-        "pattern": r"sk-[A-Za-z0-9]{48,}",
+        "re": re.compile(r"sk-[A-Za-z0-9]{48,}"),
         "name": "OpenAI API Key",
         "rotate_url": "platform.openai.com/api-keys"
     },
     {
-        "pattern": r"ghp_[A-Za-z0-9]{36}",
+        "re": re.compile(r"ghp_[A-Za-z0-9]{36}"),
         "name": "GitHub Personal Access Token",
         "rotate_url": "github.com/settings/tokens"
     },
     {
-        "pattern": r"gho_[A-Za-z0-9]{36}",
+        "re": re.compile(r"gho_[A-Za-z0-9]{36}"),
         "name": "GitHub OAuth Token",
         "rotate_url": "github.com/settings/tokens"
     },
     {
-        "pattern": r"AKIA[A-Z0-9]{16}",
+        "re": re.compile(r"AKIA[A-Z0-9]{16}"),
         "name": "AWS Access Key ID",
         "rotate_url": "console.aws.amazon.com/iam"
     },
     {
-        "pattern": r"-----BEGIN (RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----",
+        "re": re.compile(r"-----BEGIN (RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----"),
         "name": "Private Key",
         "rotate_url": "Generate new key pair and update all services"
     },
     {
-        "pattern": r"Bearer\s+[A-Za-z0-9\-_\.]{20,}",
+        "re": re.compile(r"Bearer\s+[A-Za-z0-9\-_\.]{20,}", re.IGNORECASE),
         "name": "Bearer Token",
         "rotate_url": "Rotate at the issuing service"
     },
     {
-        "pattern": r"xox[baprs]-[A-Za-z0-9\-]{10,}",
+        "re": re.compile(r"xox[baprs]-[A-Za-z0-9\-]{10,}"),
         "name": "Slack Token",
         "rotate_url": "api.slack.com/apps"
     },
     {
-        "pattern": r"sq0[a-z]{3}-[A-Za-z0-9\-_]{22,}",
+        "re": re.compile(r"sq0[a-z]{3}-[A-Za-z0-9\-_]{22,}"),
         "name": "Square Access Token",
         "rotate_url": "developer.squareup.com/apps"
     },
     {
-        "pattern": r"stripe[_-]?[a-z]*[_-]?key['\"]?\s*[:=]\s*['\"]?[a-zA-Z0-9_\-]{20,}",
+        "re": re.compile(r"stripe[_-]?[a-z]*[_-]?key['\"]?\s*[:=]\s*['\"]?[a-zA-Z0-9_\-]{20,}", re.IGNORECASE),
         "name": "Stripe API Key",
         "rotate_url": "dashboard.stripe.com/apikeys"
     },
 ]
 
+
+def patterns_with_flags(patterns: list, flags: int) -> list:
+    """Return [(index, item)] for the patterns compiled with `flags`' case mode."""
+    return [
+        (i, item) for i, item in enumerate(patterns)
+        if item["re"].flags & re.IGNORECASE == flags & re.IGNORECASE
+    ]
+
+
+# Literal prefixes of the case-sensitive token formats, checked as-is
+PROVIDER_LITERALS = ("sk-", "ghp_", "gho_", "AKIA", "-----BEGIN", "xox", "sq0")
+
+# One group per case mode: (members, literals, lowercase). A group's
+# patterns only run on text containing one of its literals (looked for in
+# the lowercased text when `lowercase` is set); plain substring tests are far
+# cheaper than the regexes on the common, clean output.
+SECRET_SCANS = [
+    (patterns_with_flags(SECRET_PATTERNS, 0), PROVIDER_LITERALS, False),
+    (patterns_with_flags(SECRET_PATTERNS, re.IGNORECASE), ("bearer", "stripe"), True),
+]
+
 # Generic patterns (lower confidence)
 GENERIC_PATTERNS = [
     {
-        "pattern": r"['\"]?password['\"]?\s*[:=]\s*['\"][^'\"]{8,}['\"]",
+        "re": re.compile(r"['\"]?password['\"]?\s*[:=]\s*['\"][^'\"]{8,}['\"]", re.IGNORECASE),
         "name": "Hardcoded Password",
         "rotate_url": "Change the password immediately"
     },
     {
-        "pattern": r"['\"]?api[_-]?key['\"]?\s*[:=]\s*['\"][A-Za-z0-9\-_]{20,}['\"]",
+        "re": re.compile(r"['\"]?api[_-]?key['\"]?\s*[:=]\s*['\"][A-Za-z0-9\-_]{20,}['\"]", re.IGNORECASE),
         "name": "Generic API Key",
         "rotate_url": "Identify the service and rotate the key"
     },
 ]
 
+# Lowercase literals the generic patterns need
+GENERIC_MARKERS = ("password", "api")
+
+# Only this many characters at each end of long Bash output are scanned,
+# which bounds the hook's cost when a command dumps a huge file
+SCAN_LIMIT = 128 * 1024
+
+
+def clip_output(text: str, limit: int = SCAN_LIMIT) -> str:
+    """Keep only the head and tail of very long output."""
+    if len(text) <= 2 * limit:
+        return text
+    return text[:limit] + "\n...\n" + text[-limit:]
+
+
+# Static parts of the warning, built once; format_warning() only fills in
+# the findings between them
+WARNING_HEADER = "\n".join([
+    "",
+    "=" * 60,
+    "  SECURITY ALERT: Possible credentials exposed in output!",
+    "=" * 60,
+    "",
+    "Detected:",
+    "",
+])
+
+WARNING_ACTIONS = "\n".join([
+    "",
+    "",
+    "IMMEDIATE ACTIONS:",
+    "  1. Rotate this credential immediately",
+    "  2. Check if this was committed to git (git log -p | grep <key>)",
+    "  3. Review who has access to this terminal/logs",
+    "",
+    "ROTATION LINKS:",
+    "",
+])
+
+WARNING_FOOTER = "\n".join([
+    "",
+    "",
+    "BEST PRACTICES:",
+    "  - Store secrets in .env files (add .env to .gitignore)",
+    "  - Use environment variables, not hardcoded values",
+    "  - Never commit secrets to version control",
+    "  - Use secret managers for production (AWS Secrets Manager, etc.)",
+    "",
+    "=" * 60,
+    "",
+])
 
-def scan_for_secrets(content: str) -> list:
-    """Scan content for secret patterns. Returns list of findings."""
+
+def scan_for_secrets(*texts: str) -> list:
+    """
+    Scan one or more texts (e.g. stdout and stderr) for secret patterns.
+    Each text is scanned on its own, so they never need to be concatenated.
+    Returns list of findings.
+    """
     findings = []
 
-    # High confidence patterns first
-    for item in SECRET_PATTERNS:
-        try:
-            if re.search(item["pattern"], content, re.IGNORECASE):
-                findings.append({
-                    "name": item["name"],
-                    "rotate_url": item["rotate_url"],
-                    "confidence": "high"
-                })
-        except re.error:
-            continue
+    # High confidence patterns first. The literal gate skips a whole group on
+    # clean output; past it, each pattern is searched on its own, which keeps
+    # the scan linear and reports overlapping secrets (e.g. "Bearer sk-ant-...").
+    matched = set()
+    generic_texts = []
+    for text in texts:
+        low = text.lower()
+        for members, literals, lowercase in SECRET_SCANS:
+            haystack = low if lowercase else text
+            if not any(literal in haystack for literal in literals):
+                continue
+            for i, item in members:
+                if i not in matched and item["re"].search(text):
+                    matched.add(i)
+        if any(marker in low for marker in GENERIC_MARKERS):
+            generic_texts.append(text)
+
+    for i in sorted(matched):
+        item = SECRET_PATTERNS[i]
+        findings.append({
+            "name": item["name"],
+            "rotate_url": item["rotate_url"],
+            "confidence": "high"
+        })
 
     # Generic patterns (only if no high-confidence matches)
     if not findings:
         for item in GENERIC_PATTERNS:
-            try:
-                if re.search(item["pattern"], content, re.IGNORECASE):
-                    findings.append({
-                        "name": item["name"],
-                        "rotate_url": item["rotate_url"],
-                        "confidence": "medium"
-                    })
-            except re.error:
-                continue
+            if any(item["re"].search(text) for text in generic_texts):
+                findings.append({
+                    "name": item["name"],
+                    "rotate_url": item["rotate_url"],
+                    "confidence": "medium"
+                })
 
     return findings
 
 
 def format_warning(findings: list) -> str:
     """Format warning message with rotation guidance."""
-    lines = [
-        "",
-        "=" * 60,
-        "  SECURITY ALERT: Possible credentials exposed in output!",
-        "=" * 60,
-        "",
-        "Detected:",
-    ]
-
-    for f in findings:
-        lines.append(f"  - {f['name']} (confidence: {f['confidence']})")
-
-    lines.extend([
-        "",
-        "IMMEDIATE ACTIONS:",
-        "  1. Rotate this credential immediately",
-        "  2. Check if this was committed to git (git log -p | grep <key>)",
-        "  3. Review who has access to this terminal/logs",
-        "",
-        "ROTATION LINKS:",
-    ])
-
-    for f in findings:
-        lines.append(f"  - {f['name']}: {f['rotate_url']}")
-
-    lines.extend([
-        "",
-        "BEST PRACTICES:",
-        "  - Store secrets in .env files (add .env to .gitignore)",
-        "  - Use environment variables, not hardcoded values",
-        "  - Never commit secrets to version control",
-        "  - Use secret managers for production (AWS Secrets Manager, etc.)",
-        "",
-        "=" * 60,
-        ""
-    ])
-
-    return "\n".join(lines)
+    detected = "\n".join(f"  - {f['name']} (confidence: {f['confidence']})" for f in findings)
+    links = "\n".join(f"  - {f['name']}: {f['rotate_url']}" for f in findings)
+    return WARNING_HEADER + detected + WARNING_ACTIONS + links + WARNING_FOOTER
 
 
 def main():
     try:
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError:
+        input_data = json_loads(sys.stdin.buffer.read())
+    except ValueError:
         sys.exit(0)
 
     tool_name = input_data.get("tool_name", "")
@@ -178,19 +239,19 @@ def main():
     if tool_name == "Bash":
         stdout = str(tool_output.get("stdout", ""))
         stderr = str(tool_output.get("stderr", ""))
-        content = stdout + "\n" + stderr
+        texts = (clip_output(stdout), clip_output(stderr))
     else:
         # Read tool returns file content
-        content = str(tool_output.get("output", ""))
+        texts = (str(tool_output.get("output", "")),)
 
-    if not content.strip():
+    if not any(text.strip() for text in texts):
         sys.exit(0)
 
-    findings = scan_for_secrets(content)
+    findings = scan_for_secrets(*texts)
 
     if findings:
         warning = format_warning(findings)
-        print(warning, file=sys.stderr)
+        sys.stderr.buffer.write((warning + "\n").encode())
 
     # PostToolUse hooks always exit 0 (observe, don't block)
     sys.exit(0)
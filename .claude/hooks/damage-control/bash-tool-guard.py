@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 # /// script
 # requires-python = ">=3.8"
-# dependencies = ["pyyaml"]
 # ///
 """
 Bash Tool Guard - PreToolUse Hook
@@ -15,46 +14,156 @@ Exit codes:
   2 = Block (stderr sent to Claude)
 """
 
+import functools
 import json
 import sys
 import re
 import os
-from pathlib import Path
 
+# orjson parses/serializes hook JSON in C when installed
 try:
-    import yaml
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
 except ImportError:
-    print("PyYAML not installed. Run: pip install pyyaml", file=sys.stderr)
-    sys.exit(0)
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+# Pattern files live next to this script; resolved once at import
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PATTERNS_YAML = os.path.join(SCRIPT_DIR, "patterns.yaml")
+PATTERNS_JSON = os.path.join(SCRIPT_DIR, "patterns.json")
+
+# Command fragments that suggest a path is being modified or deleted
+MODIFICATION_RE = re.compile(r"\brm |\bmv |>|\btee |\bsed -i|\bchmod |\bchown ")
+DELETION_RE = re.compile(r"\brm |\brmdir |\bunlink |\bdel ")
 
 
 def load_patterns():
-    """Load patterns from patterns.yaml in same directory as script."""
-    script_dir = Path(__file__).parent
-    patterns_file = script_dir / "patterns.yaml"
+    """
+    Load and compile patterns from patterns.json (patterns.yaml if the JSON
+    is missing) in same directory as script, memoized per process on the
+    file's path, mtime and size.
+    """
+    # patterns.json (generated from patterns.yaml) is the runtime source;
+    # the YAML is only a fallback for when the JSON is missing
+    if os.path.isfile(PATTERNS_JSON):
+        patterns_file = PATTERNS_JSON
+    elif os.path.isfile(PATTERNS_YAML):
+        patterns_file = PATTERNS_YAML
+    else:
+        return compile_config({})
 
-    if not patterns_file.exists():
-        return {}
+    st = os.stat(patterns_file)
 
-    with open(patterns_file, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+    # A stale JSON is still loaded (older rules beat none), but say so
+    if (patterns_file == PATTERNS_JSON and os.path.isfile(PATTERNS_YAML)
+            and os.stat(PATTERNS_YAML).st_mtime_ns > st.st_mtime_ns):
+        print(
+            "damage-control: patterns.json is stale (patterns.yaml is newer); "
+            "regenerate it with the command in patterns.yaml",
+            file=sys.stderr
+        )
 
+    return _load_patterns_cached(patterns_file, st.st_mtime_ns, st.st_size)
 
+
+@functools.lru_cache(maxsize=4)
+def _load_patterns_cached(patterns_path: str, mtime_ns: int, size: int) -> dict:
+    """Parse and compile the patterns file once per (path, mtime, size)."""
+    if patterns_path.endswith(".json"):
+        with open(patterns_path, "r", encoding="utf-8") as f:
+            config = json.load(f) or {}
+    else:
+        config = _parse_yaml(patterns_path)
+
+    return compile_config(config)
+
+
+def _parse_yaml(patterns_path: str) -> dict:
+    """Parse patterns.yaml; PyYAML is only imported on this slow path."""
+    try:
+        import yaml
+    except ImportError:
+        print(
+            "patterns.json missing and PyYAML not installed; damage-control checks skipped. "
+            "Restore patterns.json or run: pip install pyyaml",
+            file=sys.stderr
+        )
+        sys.exit(0)
+
+    # libyaml's C loader when available, otherwise the pure-Python one
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    with open(patterns_path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=loader) or {}
+
+
+def compile_config(config: dict) -> dict:
+    """
+    Compile bashToolPatterns and path patterns once per config load.
+    bashToolPatterns becomes [(regex, reason, ask)] in file order, and
+    bashToolRegex is one alternation of all of them (None if unusable).
+    """
+    compiled = dict(config)
+    patterns = []
+    for item in config.get("bashToolPatterns", []):
+        try:
+            regex = re.compile(item.get("pattern", ""), re.IGNORECASE)
+        except re.error:
+            continue
+        reason = item.get("reason", "Matched blocked pattern")
+        patterns.append((regex, reason, bool(item.get("ask", False))))
+    compiled["bashToolPatterns"] = patterns
+
+    # Numbered backreferences would point at the wrong group once fused
+    combined = None
+    sources = [regex.pattern for regex, _, _ in patterns]
+    if sources and not any(re.search(r"\\[1-9]|\(\?P=", src) for src in sources):
+        try:
+            combined = re.compile("|".join(f"(?:{src})" for src in sources), re.IGNORECASE)
+        except re.error:
+            pass
+    compiled["bashToolRegex"] = combined
+
+    for key in ("zeroAccessPaths", "readOnlyPaths", "noDeletePaths"):
+        compiled[key] = compile_path_patterns(config.get(key, []))
+
+    return compiled
+
+
+@functools.lru_cache(maxsize=256)
 def expand_path(path: str) -> str:
     """Expand ~ and environment variables in path."""
     return os.path.expanduser(os.path.expandvars(path))
 
 
-def matches_path_pattern(command: str, patterns: list) -> tuple:
-    """Check if command accesses any protected path. Returns (matched, pattern)."""
+def compile_path_patterns(patterns: list) -> list:
+    """
+    Precompile path patterns into (pattern, regex, expanded) records.
+    Globs get a regex (* = any text, ? = any char); plain paths get None
+    and are matched by substring against the pattern and its expansion.
+    """
+    records = []
     for pattern in patterns:
-        expanded = expand_path(pattern)
+        if "*" in pattern or "?" in pattern:
+            regex_pattern = "".join(
+                ".*" if ch == "*" else "." if ch == "?" else re.escape(ch)
+                for ch in pattern
+            )
+            records.append((pattern, re.compile(regex_pattern, re.IGNORECASE), None))
+        else:
+            records.append((pattern, None, expand_path(pattern)))
+    return records
+
 
-        # Handle glob patterns
-        if "*" in pattern:
-            # Convert glob to regex
-            regex_pattern = pattern.replace(".", r"\.").replace("*", ".*")
-            if re.search(regex_pattern, command, re.IGNORECASE):
+def matches_path_pattern(command: str, patterns: list) -> tuple:
+    """Check if command accesses any protected path. Returns (matched, pattern)."""
+    for pattern, regex, expanded in patterns:
+        if regex:
+            if regex.search(command):
                 return True, pattern
         else:
             # Direct path match
@@ -69,20 +178,13 @@ def check_command(command: str, config: dict) -> dict:
     Check command against all patterns.
     Returns: {"allow": True/False, "ask": True/False, "reason": str}
     """
-    # Check bash tool patterns
-    for item in config.get("bashToolPatterns", []):
-        pattern = item.get("pattern", "")
-        reason = item.get("reason", "Matched blocked pattern")
-        ask = item.get("ask", False)
-
-        try:
-            if re.search(pattern, command, re.IGNORECASE):
-                if ask:
-                    return {"allow": False, "ask": True, "reason": reason}
-                else:
-                    return {"allow": False, "ask": False, "reason": reason}
-        except re.error:
-            continue
+    # Check bash tool patterns. The fused regex rules out every pattern in a
+    # single pass; on a hit, the first matching pattern in file order wins.
+    combined = config.get("bashToolRegex")
+    if combined is None or combined.search(command):
+        for regex, reason, ask in config.get("bashToolPatterns", []):
+            if regex.search(command):
+                return {"allow": False, "ask": ask, "reason": reason}
 
     # Check zero access paths (block completely)
     matched, pattern = matches_path_pattern(command, config.get("zeroAccessPaths", []))
@@ -94,36 +196,32 @@ def check_command(command: str, config: dict) -> dict:
         }
 
     # Check read-only paths (block modifications)
-    modification_indicators = ["rm ", "mv ", ">", ">>", "tee ", "sed -i", "chmod ", "chown "]
-    for indicator in modification_indicators:
-        if indicator in command:
-            matched, pattern = matches_path_pattern(command, config.get("readOnlyPaths", []))
-            if matched:
-                return {
-                    "allow": False,
-                    "ask": False,
-                    "reason": f"Modification of read-only path blocked: {pattern}"
-                }
+    if MODIFICATION_RE.search(command):
+        matched, pattern = matches_path_pattern(command, config.get("readOnlyPaths", []))
+        if matched:
+            return {
+                "allow": False,
+                "ask": False,
+                "reason": f"Modification of read-only path blocked: {pattern}"
+            }
 
     # Check no-delete paths
-    deletion_indicators = ["rm ", "rmdir ", "unlink ", "del "]
-    for indicator in deletion_indicators:
-        if indicator in command:
-            matched, pattern = matches_path_pattern(command, config.get("noDeletePaths", []))
-            if matched:
-                return {
-                    "allow": False,
-                    "ask": False,
-                    "reason": f"Deletion of protected path blocked: {pattern}"
-                }
+    if DELETION_RE.search(command):
+        matched, pattern = matches_path_pattern(command, config.get("noDeletePaths", []))
+        if matched:
+            return {
+                "allow": False,
+                "ask": False,
+                "reason": f"Deletion of protected path blocked: {pattern}"
+            }
 
     return {"allow": True, "ask": False, "reason": ""}
 
 
 def main():
     try:
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError:
+        input_data = json_loads(sys.stdin.buffer.read())
+    except ValueError:
         sys.exit(0)  # Allow on parse error
 
     tool_name = input_data.get("tool_name", "")
@@ -134,7 +232,7 @@ def main():
     tool_input = input_data.get("tool_input", {})
     command = tool_input.get("command", "")
 
-    if not command:
+    if not command or command.isspace():
         sys.exit(0)
 
     config = load_patterns()
@@ -148,7 +246,7 @@ def main():
             "decision": "ask",
             "reason": result["reason"]
         }
-        print(json.dumps(output))
+        sys.stdout.buffer.write(json_dumps(output) + b"\n")
         sys.exit(0)
     else:
         # Block the command
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 # /// script
 # requires-python = ">=3.8"
-# dependencies = ["pyyaml"]
 # ///
 """
 Edit Tool Guard - PreToolUse Hook
@@ -13,48 +12,122 @@ Exit codes:
   2 = Block
 """
 
+import functools
 import json
 import sys
 import re
 import os
-from pathlib import Path
 
+# orjson parses the hook payload in C when installed
 try:
-    import yaml
+    import orjson
+    json_loads = orjson.loads
 except ImportError:
-    sys.exit(0)
+    json_loads = json.loads
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PATTERNS_YAML = os.path.join(SCRIPT_DIR, "patterns.yaml")
+PATTERNS_JSON = os.path.join(SCRIPT_DIR, "patterns.json")
 
 
 def load_patterns():
-    script_dir = Path(__file__).parent
-    patterns_file = script_dir / "patterns.yaml"
+    # patterns.json (generated from patterns.yaml) is the runtime source;
+    # the YAML is only a fallback for when the JSON is missing
+    if os.path.isfile(PATTERNS_JSON):
+        patterns_file = PATTERNS_JSON
+    elif os.path.isfile(PATTERNS_YAML):
+        patterns_file = PATTERNS_YAML
+    else:
+        return compile_config({})
+
+    st = os.stat(patterns_file)
+
+    # A stale JSON is still loaded (older rules beat none), but say so
+    if (patterns_file == PATTERNS_JSON and os.path.isfile(PATTERNS_YAML)
+            and os.stat(PATTERNS_YAML).st_mtime_ns > st.st_mtime_ns):
+        print(
+            "damage-control: patterns.json is stale (patterns.yaml is newer); "
+            "regenerate it with the command in patterns.yaml",
+            file=sys.stderr
+        )
+
+    return _load_patterns_cached(patterns_file, st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_patterns_cached(patterns_path: str, mtime_ns: int, size: int) -> dict:
+    """Parse and compile the patterns file once per (path, mtime, size)."""
+    if patterns_path.endswith(".json"):
+        with open(patterns_path, "r", encoding="utf-8") as f:
+            config = json.load(f) or {}
+    else:
+        config = _parse_yaml(patterns_path)
+
+    return compile_config(config)
+
+
+def _parse_yaml(patterns_path: str) -> dict:
+    try:
+        import yaml
+    except ImportError:
+        print(
+            "patterns.json missing and PyYAML not installed; damage-control checks skipped. "
+            "Restore patterns.json or run: pip install pyyaml",
+            file=sys.stderr
+        )
+        sys.exit(0)
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    with open(patterns_path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=loader) or {}
 
-    if not patterns_file.exists():
-        return {}
 
-    with open(patterns_file, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+def compile_config(config: dict) -> dict:
+    """Precompile the path patterns this hook checks."""
+    return {
+        key: compile_path_patterns(config.get(key, []))
+        for key in ("zeroAccessPaths", "readOnlyPaths")
+    }
 
 
+@functools.lru_cache(maxsize=256)
 def expand_path(path: str) -> str:
     return os.path.expanduser(os.path.expandvars(path))
 
 
+def compile_path_patterns(patterns: list) -> list:
+    """
+    Precompile path patterns into (pattern, regex, expanded, stripped)
+    records. Globs get a regex (* = any text, ? = any char); plain paths get
+    None and are matched by substring against the pattern and its
+    expansion, or by suffix against the pattern without a trailing "/".
+    """
+    records = []
+    for pattern in patterns:
+        if "*" in pattern or "?" in pattern:
+            regex_pattern = "".join(
+                ".*" if ch == "*" else "." if ch == "?" else re.escape(ch)
+                for ch in pattern
+            )
+            records.append((pattern, re.compile(regex_pattern, re.IGNORECASE), None, None))
+        else:
+            records.append((pattern, None, expand_path(pattern), pattern.rstrip("/")))
+    return records
+
+
 def matches_protected_path(file_path: str, patterns: list) -> tuple:
     """Check if file matches any protected pattern."""
     file_path = expand_path(file_path)
 
-    for pattern in patterns:
-        expanded = expand_path(pattern)
-
-        if "*" in pattern:
-            regex_pattern = pattern.replace(".", r"\.").replace("*", ".*")
-            if re.search(regex_pattern, file_path, re.IGNORECASE):
+    for pattern, regex, expanded, stripped in patterns:
+        if regex:
+            if regex.search(file_path):
                 return True, pattern
         else:
             if expanded in file_path or pattern in file_path:
                 return True, pattern
-            if file_path.endswith(pattern) or file_path.endswith(pattern.rstrip("/")):
+            if file_path.endswith(stripped):
                 return True, pattern
 
     return False, None
@@ -62,8 +135,8 @@ def matches_protected_path(file_path: str, patterns: list) -> tuple:
 
 def main():
     try:
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError:
+        input_data = json_loads(sys.stdin.buffer.read())
+    except ValueError:
         sys.exit(0)
 
     tool_name = input_data.get("tool_name", "")